@@ -1,10 +1,17 @@
+import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox
 import cv2
 from PIL import Image, ImageTk
 from src.health_monitor import HealthMonitor, OverallHealthStatus
 from src.screen_time_tracker import BreakType
 
+SEVERITY_PREFIXES = {"info": "[INFO] ", "warning": "[WARNING] ", "critical": "[CRITICAL] "}
+NO_ALERTS_TEXT = "No active alerts. Keep up the good work!"
+NOTIFY_COALESCE_SECONDS = 5
+FRAME_INTERVAL = 1 / 30
+
 class HealthMonitorGUI:
     def __init__(self, root):
         self.root = root
@@ -18,9 +25,17 @@ class HealthMonitorGUI:
         
         self.monitor = HealthMonitor()
         self.monitor.alert_callback = self.on_alert
+        self._notify_pool = ThreadPoolExecutor(max_workers=1)
+        self._last_notify = (None, 0.0)
         
         self.is_running = False
         self.current_frame = None
+        self._photo_buffers = [ImageTk.PhotoImage(Image.new("RGB", (640, 480))) for _ in range(2)]
+        self._photo_idx = 0
+        self._img_id = None
+        self._last_display_sig = None
+        self._rendered_alert_ids = None
+        self._next_tick = 0.0
         
         self.create_widgets()
         
@@ -145,6 +160,7 @@ class HealthMonitorGUI:
             self.stop_btn.config(state=tk.NORMAL)
             self.status_label.config(text="Initializing...", foreground="#ffcc00")
             
+            self._next_tick = time.monotonic()
             self.schedule_update()
         else:
             messagebox.showerror("Error", "Could not access camera. Please check if a camera is connected and not in use by another application.")
@@ -157,6 +173,9 @@ class HealthMonitorGUI:
         self.status_label.config(text="Stopped", foreground="#888888")
         
         self.video_frame.delete("all")
+        self._img_id = None
+        self._last_display_sig = None
+        self._rendered_alert_ids = None
         self.video_frame.create_text(320, 240, text="Camera Preview\nClick 'Start Monitoring' to begin", fill="#888888", font=("Segoe UI", 14), justify=tk.CENTER)
     
     def schedule_update(self):
@@ -164,33 +183,78 @@ class HealthMonitorGUI:
             return
         
         try:
-            health_state = self.monitor.process_frame()
+            result = self.monitor.get_latest_result()
             
-            if health_state:
+            if result:
+                health_state, frame = result
                 self.update_display(health_state)
-            
-            frame = self.monitor.get_annotated_frame()
-            if frame is not None:
-                self.current_frame = frame
-                self.update_video()
+                
+                if frame is not None:
+                    self.current_frame = frame
+                    self.update_video()
         except Exception as e:
             print(f"Update error: {e}")
         
         if self.is_running:
-            self.root.after(33, self.schedule_update)
+            now = time.monotonic()
+            self._next_tick += FRAME_INTERVAL
+            if self._next_tick < now:
+                self._next_tick = now + FRAME_INTERVAL
+            delay_ms = max(1, int((self._next_tick - now) * 1000))
+            self.root.after(delay_ms, self.schedule_update)
     
     def update_video(self):
         if self.current_frame is not None and self.is_running:
-            frame_rgb = cv2.cvtColor(self.current_frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
-            img = img.resize((640, 480), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
+            frame = self.current_frame
+            if frame.shape[1] != 640 or frame.shape[0] != 480:
+                frame = cv2.resize(frame, (640, 480), interpolation=cv2.INTER_AREA)
+            img = Image.frombuffer("RGB", (frame.shape[1], frame.shape[0]), frame, "raw", "RGB", 0, 1)
+            
+            self._photo_idx ^= 1
+            photo = self._photo_buffers[self._photo_idx]
+            photo.paste(img)
             
-            self.video_frame.delete("all")
-            self.video_frame.create_image(0, 0, anchor=tk.NW, image=photo)
-            self.video_frame.image = photo
+            if self._img_id is None:
+                self.video_frame.delete("all")
+                self._img_id = self.video_frame.create_image(0, 0, anchor=tk.NW, image=photo)
+            else:
+                self.video_frame.itemconfig(self._img_id, image=photo)
     
     def update_display(self, health_state):
+        signature = self._display_signature(health_state)
+        if signature != self._last_display_sig:
+            self._last_display_sig = signature
+            self.render_metrics(health_state)
+        
+        if health_state.is_user_present:
+            self.update_alerts(health_state.active_alerts)
+    
+    def _display_signature(self, health_state):
+        if not health_state.is_user_present:
+            return (False,)
+        
+        eye = health_state.eye_metrics
+        posture = health_state.posture_metrics
+        screen = health_state.screen_time_stats
+        next_break = screen.get('time_until_next_break', 9999) if screen else 0
+        
+        return (
+            health_state.overall_status,
+            round(health_state.overall_score),
+            health_state.is_calibrating,
+            round(eye.get('blink_rate', 0), 1) if eye else None,
+            round(eye.get('eye_strain_score', 0)) if eye else None,
+            eye.get('status') if eye else None,
+            round(posture.get('posture_score', 0)) if posture else None,
+            round(posture.get('distance', 0)) if posture else None,
+            posture.get('status') if posture else None,
+            tuple(posture.get('issues', [])[:2]) if posture else None,
+            round(screen.get('current_session_minutes', 0)) if screen else None,
+            round(screen.get('total_screen_time_today_minutes', 0)) if screen else None,
+            round(next_break / 60)
+        )
+    
+    def render_metrics(self, health_state):
         if not health_state.is_user_present:
             self.status_label.config(text="User Away", foreground="#888888")
             return
@@ -240,31 +304,39 @@ class HealthMonitorGUI:
             self.session_time_label.config(text=f"Current Session: {screen.get('current_session_minutes', 0):.0f} min")
             self.total_time_label.config(text=f"Today Total: {screen.get('total_screen_time_today_minutes', 0):.0f} min")
             
-            next_break = min(
-                screen.get('time_until_micro_break', 9999),
-                screen.get('time_until_short_break', 9999),
-                screen.get('time_until_long_break', 9999)
-            )
+            next_break = screen.get('time_until_next_break', 9999)
             self.next_break_label.config(text=f"Next Break: {next_break/60:.0f} min")
-        
-        self.update_alerts(health_state.active_alerts)
     
     def update_alerts(self, alerts):
-        self.alerts_text.config(state=tk.NORMAL)
-        self.alerts_text.delete(1.0, tk.END)
+        alert_ids = [a['id'] for a in alerts]
+        if alert_ids == self._rendered_alert_ids:
+            return
+        self._rendered_alert_ids = alert_ids
         
         if not alerts:
-            self.alerts_text.insert(tk.END, "No active alerts. Keep up the good work!")
+            content = NO_ALERTS_TEXT
         else:
-            for alert in alerts:
-                severity_emoji = {"info": "INFO", "warning": "WARNING", "critical": "CRITICAL"}
-                self.alerts_text.insert(tk.END, f"[{severity_emoji.get(alert['severity'], '?')}] {alert['title']}\n")
-                self.alerts_text.insert(tk.END, f"{alert['message']}\n")
-                self.alerts_text.insert(tk.END, f"Tip: {alert['recommendation']}\n\n")
+            content = "".join(
+                f"{SEVERITY_PREFIXES.get(alert['severity'], '[?] ')}{alert['title']}\n"
+                f"{alert['message']}\n"
+                f"Tip: {alert['recommendation']}\n\n"
+                for alert in alerts
+            )
         
+        self.alerts_text.config(state=tk.NORMAL)
+        self.alerts_text.delete(1.0, tk.END)
+        self.alerts_text.insert(tk.END, content)
         self.alerts_text.config(state=tk.DISABLED)
     
     def on_alert(self, alert):
+        now = time.monotonic()
+        last_type, last_time = self._last_notify
+        if alert.alert_type == last_type and now - last_time < NOTIFY_COALESCE_SECONDS:
+            return
+        self._last_notify = (alert.alert_type, now)
+        self._notify_pool.submit(self._do_notify, alert)
+    
+    def _do_notify(self, alert):
         try:
             from plyer import notification
             notification.notify(
@@ -289,6 +361,7 @@ class HealthMonitorGUI:
         self.is_running = False
         if self.monitor:
             self.monitor.stop()
+        self._notify_pool.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
 
 def main():
@@ -1,9 +1,10 @@
 import time
-from collections import deque
+from collections import deque, OrderedDict, Counter
 from dataclasses import dataclass, field
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Dict
 from enum import Enum
 import threading
+from datetime import date
 
 class AlertType(Enum):
     EYE_STRAIN = "eye_strain"
@@ -41,16 +42,18 @@ class AlertSystem:
     ESCALATION_INTERVAL = 60
     
     def __init__(self):
-        self.active_alerts: List[Alert] = []
+        self.active_alerts: "OrderedDict[int, Alert]" = OrderedDict()
         self.alert_history: deque = deque(maxlen=100)
-        self.last_alert_times: dict = {t: 0 for t in AlertType}
+        self._history_counts: Counter = Counter()
+        self.next_allowed_time: dict = {t: 0.0 for t in AlertType}
         self.escalation_counts: dict = {t: 0 for t in AlertType}
         self.pending_escalations: dict = {}
         self.alert_callbacks: List[Callable[[Alert], None]] = []
         self.is_paused = False
         self.pause_until: Optional[float] = None
         self.alerts_today = 0
-        self.last_reset_date = time.strftime("%Y-%m-%d")
+        self.version = 0
+        self._last_reset_ordinal = date.today().toordinal()
         
     def register_callback(self, callback: Callable[[Alert], None]):
         self.alert_callbacks.append(callback)
@@ -62,19 +65,18 @@ class AlertSystem:
             except Exception as e:
                 print(f"Alert callback error: {e}")
     
-    def can_send_alert(self, alert_type: AlertType) -> bool:
+    def can_send_alert(self, alert_type: AlertType, current_time: Optional[float] = None) -> bool:
+        if current_time is None:
+            current_time = time.monotonic()
+        
         if self.is_paused:
-            if self.pause_until and time.time() >= self.pause_until:
+            if self.pause_until and current_time >= self.pause_until:
                 self.is_paused = False
                 self.pause_until = None
             else:
                 return False
         
-        current_time = time.time()
-        last_time = self.last_alert_times.get(alert_type, 0)
-        cooldown = self.COOLDOWN_PERIODS.get(alert_type, 60)
-        
-        return (current_time - last_time) >= cooldown
+        return current_time >= self.next_allowed_time[alert_type]
     
     def create_alert(
         self,
@@ -87,45 +89,59 @@ class AlertSystem:
         if not self.can_send_alert(alert_type):
             return None
         
-        current_date = time.strftime("%Y-%m-%d")
-        if current_date != self.last_reset_date:
-            self.alerts_today = 0
-            self.last_reset_date = current_date
-        
-        alert = Alert(
+        return self.submit(Alert(
             alert_type=alert_type,
             severity=severity,
             title=title,
             message=message,
-            recommendation=recommendation,
-            escalation_level=self.escalation_counts.get(alert_type, 0)
-        )
+            recommendation=recommendation
+        ))
+    
+    def submit(self, alert: Alert) -> Optional[Alert]:
+        alert_type = alert.alert_type
+        current_time = time.monotonic()
+        if not self.can_send_alert(alert_type, current_time):
+            return None
+        
+        self._check_daily_reset()
         
-        self.active_alerts.append(alert)
+        alert.escalation_level = self.escalation_counts.get(alert_type, 0)
+        
+        self.active_alerts[id(alert)] = alert
+        if len(self.alert_history) == self.alert_history.maxlen:
+            self._history_counts[self.alert_history[0].alert_type] -= 1
         self.alert_history.append(alert)
-        self.last_alert_times[alert_type] = time.time()
+        self._history_counts[alert.alert_type] += 1
+        self.next_allowed_time[alert_type] = current_time + self.COOLDOWN_PERIODS.get(alert_type, 60)
         self.alerts_today += 1
+        self.version += 1
         
         self._notify_callbacks(alert)
         
-        if severity in [AlertSeverity.WARNING, AlertSeverity.CRITICAL]:
-            self._schedule_escalation(alert_type)
+        if alert.severity in [AlertSeverity.WARNING, AlertSeverity.CRITICAL]:
+            self._schedule_escalation(alert_type, current_time)
         
         return alert
     
-    def _schedule_escalation(self, alert_type: AlertType):
+    def _check_daily_reset(self):
+        today_ordinal = date.today().toordinal()
+        if today_ordinal != self._last_reset_ordinal:
+            self.alerts_today = 0
+            self._last_reset_ordinal = today_ordinal
+    
+    def _schedule_escalation(self, alert_type: AlertType, current_time: float):
         current_count = self.escalation_counts.get(alert_type, 0)
         if current_count < self.MAX_ESCALATION:
-            self.pending_escalations[alert_type] = time.time() + self.ESCALATION_INTERVAL
+            self.pending_escalations[alert_type] = current_time + self.ESCALATION_INTERVAL
     
     def check_escalations(self):
-        current_time = time.time()
+        current_time = time.monotonic()
         escalations_to_process = []
         
         for alert_type, escalation_time in list(self.pending_escalations.items()):
             if current_time >= escalation_time:
                 unacknowledged = [
-                    a for a in self.active_alerts 
+                    a for a in self.active_alerts.values()
                     if a.alert_type == alert_type and not a.acknowledged
                 ]
                 if unacknowledged:
@@ -141,75 +157,59 @@ class AlertSystem:
             del self.pending_escalations[alert.alert_type]
         self.escalation_counts[alert.alert_type] = 0
         
-        self.active_alerts = [a for a in self.active_alerts if a != alert]
+        self.active_alerts.pop(id(alert), None)
+        self.version += 1
     
     def acknowledge_all(self):
-        for alert in self.active_alerts:
+        for alert in self.active_alerts.values():
             alert.acknowledged = True
-        self.active_alerts = []
+        self.active_alerts.clear()
+        self.version += 1
         self.pending_escalations = {}
         for alert_type in self.escalation_counts:
             self.escalation_counts[alert_type] = 0
     
     def pause_alerts(self, duration_seconds: int):
         self.is_paused = True
-        self.pause_until = time.time() + duration_seconds
+        self.pause_until = time.monotonic() + duration_seconds
     
     def resume_alerts(self):
         self.is_paused = False
         self.pause_until = None
     
     def get_active_alerts(self) -> List[Alert]:
-        return [a for a in self.active_alerts if not a.acknowledged]
+        return [a for a in self.active_alerts.values() if not a.acknowledged]
     
     def get_alert_summary(self) -> dict:
         return {
             "total_today": self.alerts_today,
             "active_count": len(self.get_active_alerts()),
             "is_paused": self.is_paused,
-            "pause_remaining": max(0, (self.pause_until or 0) - time.time()) if self.is_paused else 0,
-            "by_type": {
-                t.value: len([a for a in self.alert_history if a.alert_type == t])
-                for t in AlertType
-            }
+            "pause_remaining": max(0, (self.pause_until or 0) - time.monotonic()) if self.is_paused else 0,
+            "by_type": {t.value: self._history_counts[t] for t in AlertType}
         }
 
 
-def create_eye_strain_alert(severity: AlertSeverity, message: str, recommendation: str) -> dict:
-    titles = {
-        AlertSeverity.INFO: "Eye Care Reminder",
-        AlertSeverity.WARNING: "Eye Strain Detected",
-        AlertSeverity.CRITICAL: "High Eye Strain Warning"
-    }
-    return {
-        "alert_type": AlertType.EYE_STRAIN,
-        "severity": severity,
-        "title": titles[severity],
-        "message": message,
-        "recommendation": recommendation
-    }
+_EYE_STRAIN_TITLES: Dict[AlertSeverity, str] = {
+    AlertSeverity.INFO: "Eye Care Reminder",
+    AlertSeverity.WARNING: "Eye Strain Detected",
+    AlertSeverity.CRITICAL: "High Eye Strain Warning"
+}
 
+_POSTURE_TITLES: Dict[AlertSeverity, str] = {
+    AlertSeverity.INFO: "Posture Tip",
+    AlertSeverity.WARNING: "Posture Check",
+    AlertSeverity.CRITICAL: "Posture Alert"
+}
 
-def create_posture_alert(severity: AlertSeverity, message: str, recommendation: str) -> dict:
-    titles = {
-        AlertSeverity.INFO: "Posture Tip",
-        AlertSeverity.WARNING: "Posture Check",
-        AlertSeverity.CRITICAL: "Posture Alert"
-    }
-    return {
-        "alert_type": AlertType.POSTURE,
-        "severity": severity,
-        "title": titles[severity],
-        "message": message,
-        "recommendation": recommendation
-    }
 
+def create_eye_strain_alert(severity: AlertSeverity, message: str, recommendation: str) -> Alert:
+    return Alert(AlertType.EYE_STRAIN, severity, _EYE_STRAIN_TITLES[severity], message, recommendation)
 
-def create_break_alert(severity: AlertSeverity, message: str, recommendation: str) -> dict:
-    return {
-        "alert_type": AlertType.BREAK_NEEDED,
-        "severity": severity,
-        "title": "Break Reminder",
-        "message": message,
-        "recommendation": recommendation
-    }
+
+def create_posture_alert(severity: AlertSeverity, message: str, recommendation: str) -> Alert:
+    return Alert(AlertType.POSTURE, severity, _POSTURE_TITLES[severity], message, recommendation)
+
+
+def create_break_alert(severity: AlertSeverity, message: str, recommendation: str) -> Alert:
+    return Alert(AlertType.BREAK_NEEDED, severity, "Break Reminder", message, recommendation)
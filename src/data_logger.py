@@ -1,12 +1,40 @@
 import json
+import math
 import os
+import re
+import threading
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, asdict
-import pandas as pd
+from typing import Optional, Dict, Any, TYPE_CHECKING
+from dataclasses import dataclass
 from pathlib import Path
 
-@dataclass
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_SNAPSHOT_FILE_RE = re.compile(r"\d{4}-\d{2}-\d{2}\.jsonl?")
+_SUMMARY_FILE_RE = re.compile(r"\d{4}-\d{2}-\d{2}_summary\.json")
+
+def _dumps(data: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if indent:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(",", ":")).encode()
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+@dataclass(slots=True)
 class HealthSnapshot:
     timestamp: str
     blink_rate: float
@@ -17,8 +45,23 @@ class HealthSnapshot:
     head_roll: float
     continuous_work_minutes: float
     is_user_present: bool
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "blink_rate": self.blink_rate,
+            "eye_strain_score": self.eye_strain_score,
+            "posture_score": self.posture_score,
+            "distance_from_screen": self.distance_from_screen,
+            "head_pitch": self.head_pitch,
+            "head_roll": self.head_roll,
+            "continuous_work_minutes": self.continuous_work_minutes,
+            "is_user_present": self.is_user_present
+        }
 
 class DataLogger:
+    BASELINE_SAVE_INTERVAL = 60
+    
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
@@ -29,11 +72,12 @@ class DataLogger:
         self.summaries_dir = self.data_dir / "summaries"
         self.summaries_dir.mkdir(exist_ok=True)
         
-        self.current_day_snapshots: List[HealthSnapshot] = []
         self.last_snapshot_time = 0
         self.snapshot_interval = 60
         
         self.baseline_data = self._load_baselines()
+        self._baseline_lock = threading.Lock()
+        self._baseline_timer: Optional[threading.Timer] = None
     
     def _get_today_filename(self) -> str:
         return datetime.now().strftime("%Y-%m-%d")
@@ -42,21 +86,40 @@ class DataLogger:
         baseline_file = self.data_dir / "baselines.json"
         if baseline_file.exists():
             try:
-                with open(baseline_file, "r") as f:
-                    return json.load(f)
+                with open(baseline_file, "rb") as f:
+                    return _loads(f.read())
             except:
                 pass
         return {
             "blink_rate": None,
+            "blink_rate_m2": 0.0,
             "posture_baseline": None,
             "typical_distance": None,
+            "typical_distance_m2": 0.0,
             "samples_count": 0
         }
     
     def _save_baselines(self):
         baseline_file = self.data_dir / "baselines.json"
-        with open(baseline_file, "w") as f:
-            json.dump(self.baseline_data, f, indent=2)
+        with self._baseline_lock:
+            with open(baseline_file, "wb") as f:
+                f.write(_dumps(self.baseline_data, indent=True))
+    
+    def _schedule_baseline_save(self):
+        with self._baseline_lock:
+            if self._baseline_timer is not None:
+                return
+            self._baseline_timer = threading.Timer(self.BASELINE_SAVE_INTERVAL, self._flush_baselines)
+            self._baseline_timer.daemon = True
+            self._baseline_timer.start()
+    
+    def _flush_baselines(self):
+        with self._baseline_lock:
+            timer, self._baseline_timer = self._baseline_timer, None
+        if timer is None:
+            return
+        timer.cancel()
+        self._save_baselines()
     
     def log_snapshot(
         self,
@@ -87,76 +150,81 @@ class DataLogger:
             is_user_present=is_present
         )
         
-        self.current_day_snapshots.append(snapshot)
         self.last_snapshot_time = current_time
         
+        self._append_snapshot(snapshot)
         self._update_baselines(snapshot)
-        
-        if len(self.current_day_snapshots) % 10 == 0:
-            self._save_current_day()
     
     def _update_baselines(self, snapshot: HealthSnapshot):
         if not snapshot.is_user_present:
             return
         
-        count = self.baseline_data["samples_count"]
-        
-        if self.baseline_data["blink_rate"] is None:
-            self.baseline_data["blink_rate"] = snapshot.blink_rate
-        else:
-            old_rate = self.baseline_data["blink_rate"]
-            self.baseline_data["blink_rate"] = (old_rate * count + snapshot.blink_rate) / (count + 1)
-        
-        if self.baseline_data["typical_distance"] is None:
-            self.baseline_data["typical_distance"] = snapshot.distance_from_screen
-        else:
-            old_dist = self.baseline_data["typical_distance"]
-            self.baseline_data["typical_distance"] = (old_dist * count + snapshot.distance_from_screen) / (count + 1)
-        
-        self.baseline_data["samples_count"] = count + 1
+        with self._baseline_lock:
+            count = self.baseline_data["samples_count"] + 1
+            
+            for key, value in (
+                ("blink_rate", snapshot.blink_rate),
+                ("typical_distance", snapshot.distance_from_screen)
+            ):
+                mean = self.baseline_data[key]
+                if mean is None:
+                    self.baseline_data[key] = value
+                    self.baseline_data[f"{key}_m2"] = 0.0
+                    continue
+                
+                delta = value - mean
+                mean += delta / count
+                self.baseline_data[key] = mean
+                self.baseline_data[f"{key}_m2"] = self.baseline_data.get(f"{key}_m2", 0.0) + delta * (value - mean)
+            
+            self.baseline_data["samples_count"] = count
         
-        if count % 100 == 0:
-            self._save_baselines()
+        self._schedule_baseline_save()
     
-    def _save_current_day(self):
-        if not self.current_day_snapshots:
-            return
-        
-        filename = self.snapshots_dir / f"{self._get_today_filename()}.json"
+    def _append_snapshot(self, snapshot: HealthSnapshot):
+        filename = self.snapshots_dir / f"{self._get_today_filename()}.jsonl"
         
-        data = [asdict(s) for s in self.current_day_snapshots]
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
+        with open(filename, "ab") as f:
+            f.write(_dumps(snapshot.to_dict()) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
     
     def save_daily_summary(self, summary: Dict[str, Any]):
-        self._save_current_day()
+        self._flush_baselines()
         
         filename = self.summaries_dir / f"{self._get_today_filename()}_summary.json"
-        with open(filename, "w") as f:
-            json.dump(summary, f, indent=2)
+        with open(filename, "wb") as f:
+            f.write(_dumps(summary, indent=True))
     
-    def get_historical_data(self, days: int = 7) -> pd.DataFrame:
-        all_data = []
+    def get_historical_data(self, days: int = 7) -> "pd.DataFrame":
+        import pandas as pd
+        
+        frames = []
         
         for i in range(days):
             date = datetime.now() - timedelta(days=i)
-            filename = self.snapshots_dir / f"{date.strftime('%Y-%m-%d')}.json"
+            stem = date.strftime('%Y-%m-%d')
+            filename = self.snapshots_dir / f"{stem}.jsonl"
+            legacy_filename = self.snapshots_dir / f"{stem}.json"
             
             if filename.exists():
                 try:
-                    with open(filename, "r") as f:
-                        data = json.load(f)
-                        all_data.extend(data)
+                    frames.append(pd.read_json(filename, lines=True))
+                except:
+                    pass
+            
+            if legacy_filename.exists():
+                try:
+                    with open(legacy_filename, "rb") as f:
+                        frames.append(pd.DataFrame(_loads(f.read())))
                 except:
                     pass
         
-        if self.current_day_snapshots:
-            all_data.extend([asdict(s) for s in self.current_day_snapshots])
-        
-        if not all_data:
+        frames = [f for f in frames if not f.empty]
+        if not frames:
             return pd.DataFrame()
         
-        df = pd.DataFrame(all_data)
+        df = pd.concat(frames, ignore_index=True)
         df["timestamp"] = pd.to_datetime(df["timestamp"])
         return df.sort_values("timestamp")
     
@@ -166,36 +234,39 @@ class DataLogger:
         if df.empty:
             return {"status": "insufficient_data", "message": "Not enough data for trend analysis"}
         
-        df["date"] = df["timestamp"].dt.date
+        trend_columns = ["blink_rate", "eye_strain_score", "posture_score"]
         
-        daily_stats = df.groupby("date").agg({
+        daily_stats = df.groupby(df["timestamp"].dt.normalize().rename("date")).agg({
             "blink_rate": "mean",
             "eye_strain_score": "mean",
             "posture_score": "mean",
             "distance_from_screen": "mean"
-        }).reset_index()
+        })
         
         trends = {}
         
-        for col in ["blink_rate", "eye_strain_score", "posture_score"]:
-            if len(daily_stats) >= 3:
-                recent = daily_stats[col].iloc[-3:].mean()
-                older = daily_stats[col].iloc[:-3].mean() if len(daily_stats) > 3 else recent
-                
-                change = ((recent - older) / older * 100) if older != 0 else 0
-                
+        if len(daily_stats) >= 3:
+            recent = daily_stats[trend_columns].iloc[-3:].mean()
+            older = daily_stats[trend_columns].iloc[:-3].mean() if len(daily_stats) > 3 else recent
+            change = ((recent - older) / older.where(older != 0) * 100).fillna(0)
+            
+            for col in trend_columns:
+                col_change = change[col]
                 if col == "eye_strain_score":
-                    trend = "improving" if change < -5 else "declining" if change > 5 else "stable"
+                    trend = "improving" if col_change < -5 else "declining" if col_change > 5 else "stable"
                 else:
-                    trend = "improving" if change > 5 else "declining" if change < -5 else "stable"
+                    trend = "improving" if col_change > 5 else "declining" if col_change < -5 else "stable"
                 
                 trends[col] = {
-                    "current_average": recent,
-                    "previous_average": older,
-                    "change_percent": change,
+                    "current_average": recent[col],
+                    "previous_average": older[col],
+                    "change_percent": col_change,
                     "trend": trend
                 }
         
+        daily_stats = daily_stats.reset_index()
+        daily_stats["date"] = daily_stats["date"].dt.date
+        
         return {
             "status": "success",
             "days_analyzed": len(daily_stats),
@@ -204,17 +275,22 @@ class DataLogger:
         }
     
     def get_baselines(self) -> Dict[str, Any]:
-        return self.baseline_data.copy()
+        with self._baseline_lock:
+            baselines = self.baseline_data.copy()
+        
+        count = baselines["samples_count"]
+        for key in ("blink_rate", "typical_distance"):
+            m2 = baselines.get(f"{key}_m2", 0.0)
+            baselines[f"{key}_std_dev"] = math.sqrt(m2 / (count - 1)) if count > 1 else None
+        return baselines
     
     def cleanup_old_data(self, keep_days: int = 30):
-        cutoff_date = datetime.now() - timedelta(days=keep_days)
+        cutoff_str = (datetime.now() - timedelta(days=keep_days)).strftime("%Y-%m-%d")
         
-        for directory in [self.snapshots_dir, self.summaries_dir]:
-            for file in directory.glob("*.json"):
-                try:
-                    file_date_str = file.stem.split("_")[0]
-                    file_date = datetime.strptime(file_date_str, "%Y-%m-%d")
-                    if file_date < cutoff_date:
-                        file.unlink()
-                except:
-                    pass
+        for directory, name_re in [
+            (self.snapshots_dir, _SNAPSHOT_FILE_RE),
+            (self.summaries_dir, _SUMMARY_FILE_RE)
+        ]:
+            for file in directory.glob("*.json*"):
+                if name_re.fullmatch(file.name) and file.name[:10] < cutoff_str:
+                    file.unlink(missing_ok=True)
@@ -1,16 +1,31 @@
 import time
+import bisect
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, NamedTuple
 from enum import Enum
+import numpy as np
+
+from .jit import njit
+
+EAR_BLINK_THRESHOLD = 0.21
+MIN_BLINK_DURATION = 0.05
+MAX_BLINK_DURATION = 0.5
+EAR_HISTORY_SIZE = 30
+BLINK_HISTORY_SIZE = 100
+RECENT_BLINK_COUNT = 20
+EAR_CLOSE_RATIO = 0.8
+EAR_OPEN_RATIO = 0.9
 
 class EyeHealthStatus(Enum):
     HEALTHY = "healthy"
     WARNING = "warning"
     CRITICAL = "critical"
 
-@dataclass
-class BlinkEvent:
+_STATUS_THRESHOLDS = (30, 60)
+_STATUS_LEVELS = (EyeHealthStatus.HEALTHY, EyeHealthStatus.WARNING, EyeHealthStatus.CRITICAL)
+
+class BlinkEvent(NamedTuple):
     timestamp: float
     duration: float
 
@@ -23,20 +38,69 @@ class EyeHealthMetrics:
     time_since_last_blink: float
     current_ear: float
 
+@njit(cache=True)
+def _eye_strain_kernel(
+    blink_rate: float,
+    time_since_blink: float,
+    avg_ear: float,
+    baseline_blink_rate: float,
+    tables: Tuple[np.ndarray, ...]
+) -> float:
+    rate_thr, rate_pen, time_thr, time_pen, ear_thr, ear_pen, dev_thr, dev_pen = tables
+    
+    score = (
+        rate_pen[np.searchsorted(rate_thr, blink_rate, side="right")]
+        + time_pen[np.searchsorted(time_thr, time_since_blink, side="left")]
+        + ear_pen[np.searchsorted(ear_thr, avg_ear, side="right")]
+    )
+    
+    if baseline_blink_rate > 0:
+        rate_deviation = (baseline_blink_rate - blink_rate) / baseline_blink_rate
+        score += dev_pen[np.searchsorted(dev_thr, rate_deviation, side="left")]
+    
+    return min(100.0, score)
+
 class EyeTracker:
     HEALTHY_BLINK_RATE_MIN = 12
     HEALTHY_BLINK_RATE_MAX = 20
     WARNING_BLINK_RATE = 8
     CRITICAL_BLINK_RATE = 5
-    EAR_BLINK_THRESHOLD = 0.21
-    MIN_BLINK_DURATION = 0.05
-    MAX_BLINK_DURATION = 0.5
     BLINK_HISTORY_WINDOW = 60
+    CALIBRATION_FPS_ESTIMATE = 30
+    
+    _BLINK_RATE_THR = np.array([CRITICAL_BLINK_RATE, WARNING_BLINK_RATE, HEALTHY_BLINK_RATE_MIN], dtype=np.float64)
+    _BLINK_RATE_PEN = np.array([40, 25, 10, 0], dtype=np.float64)
+    _TIME_THR = np.array([10, 15, 30], dtype=np.float64)
+    _TIME_PEN = np.array([0, 5, 15, 30], dtype=np.float64)
+    _EAR_THR = np.array([0.22, 0.24], dtype=np.float64)
+    _EAR_PEN = np.array([20, 10, 0], dtype=np.float64)
+    _RATE_DEV_THR = np.array([0.3, 0.5], dtype=np.float64)
+    _RATE_DEV_PEN = np.array([0, 8, 15], dtype=np.float64)
+    _STRAIN_TABLES = (
+        _BLINK_RATE_THR, _BLINK_RATE_PEN,
+        _TIME_THR, _TIME_PEN,
+        _EAR_THR, _EAR_PEN,
+        _RATE_DEV_THR, _RATE_DEV_PEN
+    )
     
     def __init__(self):
-        self.blink_history: deque = deque(maxlen=100)
-        self.ear_history: deque = deque(maxlen=30)
+        self._blink_dur = np.empty(BLINK_HISTORY_SIZE, dtype=np.float32)
+        self._blink_head = 0
+        self._blink_count = 0
+        self.blink_window: deque = deque()
+        self._recent_duration_sum = 0.0
+        self._ear_buf = np.zeros(EAR_HISTORY_SIZE, dtype=np.float32)
+        self._ear_idx = 0
+        self._ear_count = 0
+        self._ear_sum = 0.0
+        self._tick = 0
+        self._strain_tick = -1
+        self._cached_strain_score = 0.0
+        self._status_tick = -1
+        self._cached_status = EyeHealthStatus.HEALTHY
         self.is_eye_closed = False
+        self._ear_low = EAR_BLINK_THRESHOLD
+        self._ear_high = EAR_BLINK_THRESHOLD
         self.eye_close_start_time: Optional[float] = None
         self.last_blink_time: float = time.time()
         self.baseline_blink_rate: Optional[float] = None
@@ -44,124 +108,143 @@ class EyeTracker:
         self.is_calibrating = True
         self.calibration_start_time = time.time()
         self.calibration_duration = 120
+        self._calib_ear_buf = np.empty(self.calibration_duration * self.CALIBRATION_FPS_ESTIMATE, dtype=np.float32)
+        self._calib_ear_n = 0
         
-    def update(self, left_ear: float, right_ear: float) -> Optional[BlinkEvent]:
-        current_time = time.time()
+    def update(self, left_ear: float, right_ear: float, now: Optional[float] = None) -> Optional[BlinkEvent]:
+        current_time = time.time() if now is None else now
         avg_ear = (left_ear + right_ear) / 2
-        self.ear_history.append(avg_ear)
+        
+        ear_buf = self._ear_buf
+        i = self._ear_idx % EAR_HISTORY_SIZE
+        if self._ear_count == EAR_HISTORY_SIZE:
+            self._ear_sum -= float(ear_buf[i])
+        else:
+            self._ear_count += 1
+        ear_buf[i] = avg_ear
+        self._ear_sum += float(ear_buf[i])
+        self._ear_idx += 1
+        self._tick += 1
         
         blink_event = None
+        blink_window = self.blink_window
         
-        if avg_ear < self.EAR_BLINK_THRESHOLD:
-            if not self.is_eye_closed:
-                self.is_eye_closed = True
-                self.eye_close_start_time = current_time
+        if self.is_eye_closed:
+            closed = avg_ear <= self._ear_high
         else:
-            if self.is_eye_closed and self.eye_close_start_time:
+            closed = avg_ear < self._ear_low
+        if closed != self.is_eye_closed:
+            if closed:
+                self.eye_close_start_time = current_time
+            else:
                 blink_duration = current_time - self.eye_close_start_time
                 
-                if self.MIN_BLINK_DURATION <= blink_duration <= self.MAX_BLINK_DURATION:
-                    blink_event = BlinkEvent(
-                        timestamp=current_time,
-                        duration=blink_duration
-                    )
-                    self.blink_history.append(blink_event)
+                if MIN_BLINK_DURATION <= blink_duration <= MAX_BLINK_DURATION:
+                    blink_event = BlinkEvent(current_time, blink_duration)
+                    self._record_blink(blink_duration)
+                    blink_window.append(current_time)
                     self.last_blink_time = current_time
                     
                     if self.is_calibrating:
                         self.calibration_blinks.append(current_time)
                 
-                self.is_eye_closed = False
                 self.eye_close_start_time = None
+            self.is_eye_closed = closed
+        
+        window_start = current_time - self.BLINK_HISTORY_WINDOW
+        while blink_window and blink_window[0] < window_start:
+            blink_window.popleft()
         
         if self.is_calibrating:
+            if self._calib_ear_n == len(self._calib_ear_buf):
+                self._calib_ear_buf = np.concatenate((self._calib_ear_buf, np.empty_like(self._calib_ear_buf)))
+            self._calib_ear_buf[self._calib_ear_n] = avg_ear
+            self._calib_ear_n += 1
             if current_time - self.calibration_start_time >= self.calibration_duration:
                 self._complete_calibration()
         
         return blink_event
     
+    def _record_blink(self, duration: float):
+        head = self._blink_head
+        if self._blink_count >= RECENT_BLINK_COUNT:
+            self._recent_duration_sum -= float(self._blink_dur[(head - RECENT_BLINK_COUNT) % BLINK_HISTORY_SIZE])
+        self._blink_dur[head] = duration
+        self._recent_duration_sum += float(self._blink_dur[head])
+        self._blink_head = (head + 1) % BLINK_HISTORY_SIZE
+        if self._blink_count < BLINK_HISTORY_SIZE:
+            self._blink_count += 1
+    
     def _complete_calibration(self):
         if len(self.calibration_blinks) >= 5:
             duration_minutes = self.calibration_duration / 60
             self.baseline_blink_rate = len(self.calibration_blinks) / duration_minutes
+        if self._calib_ear_n >= 10:
+            ear_ref = float(np.median(self._calib_ear_buf[:self._calib_ear_n]))
+            self._ear_low = ear_ref * EAR_CLOSE_RATIO
+            self._ear_high = ear_ref * EAR_OPEN_RATIO
         self.is_calibrating = False
         self.calibration_blinks = []
+        self._calib_ear_buf = np.empty(0, dtype=np.float32)
+        self._calib_ear_n = 0
     
     def get_current_blink_rate(self) -> float:
-        current_time = time.time()
-        window_start = current_time - self.BLINK_HISTORY_WINDOW
-        
-        recent_blinks = [b for b in self.blink_history if b.timestamp >= window_start]
-        
-        if len(recent_blinks) < 2:
+        if len(self.blink_window) < 2:
             return 0.0
         
         duration_minutes = self.BLINK_HISTORY_WINDOW / 60
-        return len(recent_blinks) / duration_minutes
+        return len(self.blink_window) / duration_minutes
+    
+    def get_average_ear(self) -> float:
+        return self._ear_sum / self._ear_count if self._ear_count else 0.25
     
-    def calculate_eye_strain_score(self) -> float:
+    def calculate_eye_strain_score(self, now: Optional[float] = None) -> float:
+        if self._strain_tick == self._tick:
+            return self._cached_strain_score
+        
         blink_rate = self.get_current_blink_rate()
-        time_since_blink = time.time() - self.last_blink_time
-        avg_ear = sum(self.ear_history) / len(self.ear_history) if self.ear_history else 0.25
-        
-        score = 0.0
-        
-        if blink_rate < self.CRITICAL_BLINK_RATE:
-            score += 40
-        elif blink_rate < self.WARNING_BLINK_RATE:
-            score += 25
-        elif blink_rate < self.HEALTHY_BLINK_RATE_MIN:
-            score += 10
-        
-        if time_since_blink > 30:
-            score += 30
-        elif time_since_blink > 15:
-            score += 15
-        elif time_since_blink > 10:
-            score += 5
-        
-        if avg_ear < 0.22:
-            score += 20
-        elif avg_ear < 0.24:
-            score += 10
-        
-        if self.baseline_blink_rate:
-            rate_deviation = (self.baseline_blink_rate - blink_rate) / self.baseline_blink_rate
-            if rate_deviation > 0.5:
-                score += 15
-            elif rate_deviation > 0.3:
-                score += 8
-        
-        return min(100, score)
+        time_since_blink = (time.time() if now is None else now) - self.last_blink_time
+        
+        self._cached_strain_score = float(_eye_strain_kernel(
+            float(blink_rate),
+            float(time_since_blink),
+            float(self.get_average_ear()),
+            float(self.baseline_blink_rate or 0.0),
+            self._STRAIN_TABLES
+        ))
+        self._strain_tick = self._tick
+        return self._cached_strain_score
     
-    def get_health_status(self) -> EyeHealthStatus:
-        score = self.calculate_eye_strain_score()
-        
-        if score >= 60:
-            return EyeHealthStatus.CRITICAL
-        elif score >= 30:
-            return EyeHealthStatus.WARNING
-        return EyeHealthStatus.HEALTHY
+    def get_health_status(self, now: Optional[float] = None) -> EyeHealthStatus:
+        if self._status_tick == self._tick:
+            return self._cached_status
+        
+        status = _STATUS_LEVELS[bisect.bisect_right(_STATUS_THRESHOLDS, self.calculate_eye_strain_score(now))]
+        self._cached_status = status
+        self._status_tick = self._tick
+        return status
     
-    def get_metrics(self) -> EyeHealthMetrics:
+    def get_metrics(self, now: Optional[float] = None) -> EyeHealthMetrics:
+        if now is None:
+            now = time.time()
         blink_rate = self.get_current_blink_rate()
         
-        recent_blinks = list(self.blink_history)[-20:]
-        avg_duration = sum(b.duration for b in recent_blinks) / len(recent_blinks) if recent_blinks else 0.0
+        recent_count = min(self._blink_count, RECENT_BLINK_COUNT)
+        avg_duration = self._recent_duration_sum / recent_count if recent_count else 0.0
         
-        avg_ear = sum(self.ear_history) / len(self.ear_history) if self.ear_history else 0.25
+        avg_ear = self.get_average_ear()
         
         return EyeHealthMetrics(
             blink_rate=blink_rate,
             avg_blink_duration=avg_duration,
-            eye_strain_score=self.calculate_eye_strain_score(),
-            status=self.get_health_status(),
-            time_since_last_blink=time.time() - self.last_blink_time,
+            eye_strain_score=self.calculate_eye_strain_score(now),
+            status=self.get_health_status(now),
+            time_since_last_blink=now - self.last_blink_time,
             current_ear=avg_ear
         )
     
-    def get_recommendation(self) -> Optional[str]:
-        metrics = self.get_metrics()
+    def get_recommendation(self, now: Optional[float] = None) -> Optional[str]:
+        metrics = self.get_metrics(now)
         
         if metrics.status == EyeHealthStatus.CRITICAL:
             if metrics.time_since_last_blink > 20:
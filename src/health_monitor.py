@@ -1,7 +1,12 @@
 import time
-from dataclasses import dataclass
-from typing import Optional, Callable
+import bisect
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Optional, Callable, Tuple
 from enum import Enum
+import cv2
+import numpy as np
 
 from .vision_engine import VisionEngine, FaceLandmarks
 from .eye_tracker import EyeTracker, EyeHealthStatus
@@ -16,7 +21,15 @@ class OverallHealthStatus(Enum):
     FAIR = "fair"
     NEEDS_ATTENTION = "needs_attention"
 
-@dataclass
+_OVERALL_THRESHOLDS = (50, 70, 85)
+_OVERALL_LEVELS = (
+    OverallHealthStatus.NEEDS_ATTENTION,
+    OverallHealthStatus.FAIR,
+    OverallHealthStatus.GOOD,
+    OverallHealthStatus.EXCELLENT
+)
+
+@dataclass(slots=True)
 class HealthState:
     overall_status: OverallHealthStatus
     overall_score: float
@@ -37,12 +50,20 @@ class HealthMonitor:
         self.data_logger = DataLogger()
         
         self.is_running = False
+        self.inference_worker: Optional[InferenceWorker] = None
+        self.lock = threading.Lock()
         self.last_frame = None
         self.last_landmarks = None
         self.frame_callback: Optional[Callable] = None
         self.alert_callback: Optional[Callable] = None
         
         self.alert_system.register_callback(self._on_alert)
+        
+        self.heavy_interval = 0.5
+        self._last_heavy_ts = 0.0
+        self._alert_dicts: list = []
+        self._alerts_version = -1
+        self._state: Optional[HealthState] = None
     
     def _on_alert(self, alert):
         if self.alert_callback:
@@ -52,13 +73,23 @@ class HealthMonitor:
         if not self.vision_engine.start_camera(camera_index):
             return False
         self.is_running = True
+        self.inference_worker = InferenceWorker(self)
+        self.inference_worker.start()
         return True
     
     def stop(self):
         self.is_running = False
+        if self.inference_worker:
+            self.inference_worker.stop()
+            self.inference_worker = None
         self.vision_engine.stop_camera()
         self.data_logger.save_daily_summary(self.screen_time_tracker.get_daily_summary())
     
+    def get_latest_result(self) -> Optional[Tuple[HealthState, Optional[np.ndarray]]]:
+        if not self.inference_worker:
+            return None
+        return self.inference_worker.get_result()
+    
     def process_frame(self) -> Optional[HealthState]:
         if not self.is_running:
             return None
@@ -67,38 +98,49 @@ class HealthMonitor:
         if frame is None:
             return None
         
+        now = time.time()
+        monotonic_now = time.monotonic()
+        with self.lock:
+            return self._process(frame, now, monotonic_now)
+    
+    def _process(self, frame, now: float, monotonic_now: float) -> HealthState:
         self.last_frame = frame
         landmarks = self.vision_engine.process_frame(frame)
         self.last_landmarks = landmarks
         
         face_detected = landmarks is not None
-        self.screen_time_tracker.update(face_detected)
+        self.screen_time_tracker.update(face_detected, monotonic_now)
         
         if not face_detected:
-            return HealthState(
+            self._state = HealthState(
                 overall_status=OverallHealthStatus.GOOD,
                 overall_score=100,
                 eye_metrics={},
                 posture_metrics={},
-                screen_time_stats=self.screen_time_tracker.get_statistics(),
-                active_alerts=self.alert_system.get_active_alerts(),
+                screen_time_stats=self.screen_time_tracker.get_statistics(monotonic_now),
+                active_alerts=self._get_alert_dicts(),
                 is_calibrating=False,
                 is_user_present=False
             )
+            return self._state
         
-        left_ear = self.vision_engine.calculate_eye_aspect_ratio(landmarks, "left")
-        right_ear = self.vision_engine.calculate_eye_aspect_ratio(landmarks, "right")
-        self.eye_tracker.update(left_ear, right_ear)
+        left_ear, right_ear, pitch, yaw, roll, distance = self.vision_engine.calculate_face_metrics(landmarks)
+        self.eye_tracker.update(left_ear, right_ear, now)
+        self.posture_analyzer.update((pitch, yaw, roll), distance, now)
         
-        head_pose = self.vision_engine.calculate_head_pose(landmarks)
-        distance = self.vision_engine.estimate_face_distance(landmarks)
-        self.posture_analyzer.update(head_pose, distance)
+        state = self._state
+        if state is not None and state.is_user_present and monotonic_now - self._last_heavy_ts < self.heavy_interval:
+            active_alerts = self._get_alert_dicts()
+            if active_alerts is not state.active_alerts:
+                state = self._state = replace(state, active_alerts=active_alerts)
+            return state
+        self._last_heavy_ts = monotonic_now
         
-        eye_metrics = self.eye_tracker.get_metrics()
+        eye_metrics = self.eye_tracker.get_metrics(now)
         posture_metrics = self.posture_analyzer.get_metrics()
-        screen_stats = self.screen_time_tracker.get_statistics()
+        screen_stats = self.screen_time_tracker.get_statistics(monotonic_now)
         
-        self._check_and_send_alerts(eye_metrics, posture_metrics, screen_stats)
+        self._check_and_send_alerts(eye_metrics, posture_metrics, screen_stats, now, monotonic_now)
         
         self._log_data(eye_metrics, posture_metrics, screen_stats)
         
@@ -107,7 +149,7 @@ class HealthMonitor:
         
         is_calibrating = self.eye_tracker.is_calibrating or self.posture_analyzer.is_calibrating
         
-        return HealthState(
+        self._state = HealthState(
             overall_status=overall_status,
             overall_score=overall_score,
             eye_metrics={
@@ -127,8 +169,17 @@ class HealthMonitor:
                 "bad_posture_duration": posture_metrics.bad_posture_duration
             },
             screen_time_stats=screen_stats,
-            active_alerts=[
+            active_alerts=self._get_alert_dicts(),
+            is_calibrating=is_calibrating,
+            is_user_present=True
+        )
+        return self._state
+    
+    def _get_alert_dicts(self) -> list:
+        if self.alert_system.version != self._alerts_version:
+            self._alert_dicts = [
                 {
+                    "id": id(a),
                     "type": a.alert_type.value,
                     "severity": a.severity.value,
                     "title": a.title,
@@ -136,48 +187,46 @@ class HealthMonitor:
                     "recommendation": a.recommendation
                 }
                 for a in self.alert_system.get_active_alerts()
-            ],
-            is_calibrating=is_calibrating,
-            is_user_present=True
-        )
+            ]
+            self._alerts_version = self.alert_system.version
+        return self._alert_dicts
     
-    def _check_and_send_alerts(self, eye_metrics, posture_metrics, screen_stats):
-        if eye_metrics.status == EyeHealthStatus.CRITICAL:
-            recommendation = self.eye_tracker.get_recommendation()
-            alert_data = create_eye_strain_alert(
-                AlertSeverity.CRITICAL,
-                f"Your eye strain score is {eye_metrics.eye_strain_score:.0f}%",
-                recommendation or "Take a break and rest your eyes"
-            )
-            self.alert_system.create_alert(**alert_data)
-        elif eye_metrics.status == EyeHealthStatus.WARNING:
-            recommendation = self.eye_tracker.get_recommendation()
-            alert_data = create_eye_strain_alert(
-                AlertSeverity.WARNING,
-                f"Your blink rate is lower than normal ({eye_metrics.blink_rate:.1f} blinks/min)",
-                recommendation or "Try to blink more often"
-            )
-            self.alert_system.create_alert(**alert_data)
+    def _check_and_send_alerts(self, eye_metrics, posture_metrics, screen_stats, now: float, monotonic_now: float):
+        can_send = self.alert_system.can_send_alert
+        
+        if eye_metrics.status != EyeHealthStatus.HEALTHY and can_send(AlertType.EYE_STRAIN, monotonic_now):
+            recommendation = self.eye_tracker.get_recommendation(now)
+            if eye_metrics.status == EyeHealthStatus.CRITICAL:
+                alert = create_eye_strain_alert(
+                    AlertSeverity.CRITICAL,
+                    f"Your eye strain score is {eye_metrics.eye_strain_score:.0f}%",
+                    recommendation or "Take a break and rest your eyes"
+                )
+            else:
+                alert = create_eye_strain_alert(
+                    AlertSeverity.WARNING,
+                    f"Your blink rate is lower than normal ({eye_metrics.blink_rate:.1f} blinks/min)",
+                    recommendation or "Try to blink more often"
+                )
+            self.alert_system.submit(alert)
         
-        if self.posture_analyzer.should_alert():
+        if can_send(AlertType.POSTURE, monotonic_now) and self.posture_analyzer.should_alert():
             recommendation = self.posture_analyzer.get_recommendation()
             severity = AlertSeverity.CRITICAL if posture_metrics.status == PostureStatus.POOR else AlertSeverity.WARNING
-            alert_data = create_posture_alert(
+            self.alert_system.submit(create_posture_alert(
                 severity,
                 f"Poor posture detected for {posture_metrics.bad_posture_duration:.0f} seconds",
                 recommendation or "Adjust your sitting position"
-            )
-            self.alert_system.create_alert(**alert_data)
+            ))
         
-        break_rec = self.screen_time_tracker.get_break_recommendation()
+        break_rec = self.screen_time_tracker.get_break_recommendation(monotonic_now) if can_send(AlertType.BREAK_NEEDED, monotonic_now) else None
         if break_rec:
             severity = AlertSeverity.WARNING if break_rec.break_type == BreakType.LONG else AlertSeverity.INFO
-            alert_data = create_break_alert(
+            self.alert_system.submit(create_break_alert(
                 severity,
                 break_rec.reason,
                 "\n".join(break_rec.exercises[:3])
-            )
-            self.alert_system.create_alert(**alert_data)
+            ))
         
         self.alert_system.check_escalations()
     
@@ -201,38 +250,69 @@ class HealthMonitor:
         return max(0, min(100, overall))
     
     def _determine_overall_status(self, score: float) -> OverallHealthStatus:
-        if score >= 85:
-            return OverallHealthStatus.EXCELLENT
-        elif score >= 70:
-            return OverallHealthStatus.GOOD
-        elif score >= 50:
-            return OverallHealthStatus.FAIR
-        return OverallHealthStatus.NEEDS_ATTENTION
-    
-    def get_annotated_frame(self):
+        return _OVERALL_LEVELS[bisect.bisect_right(_OVERALL_THRESHOLDS, score)]
+    
+    def get_annotated_frame(self) -> Optional[np.ndarray]:
         if self.last_frame is None:
             return None
         
+        frame = self.last_frame
         if self.last_landmarks:
-            return self.vision_engine.draw_landmarks(self.last_frame, self.last_landmarks)
-        return self.last_frame
+            frame = self.vision_engine.draw_landmarks(frame, self.last_landmarks, inplace=True)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     
     def acknowledge_alert(self, alert_index: int = 0):
-        alerts = self.alert_system.get_active_alerts()
-        if 0 <= alert_index < len(alerts):
-            self.alert_system.acknowledge_alert(alerts[alert_index])
+        with self.lock:
+            alerts = self.alert_system.get_active_alerts()
+            if 0 <= alert_index < len(alerts):
+                self.alert_system.acknowledge_alert(alerts[alert_index])
     
     def acknowledge_all_alerts(self):
-        self.alert_system.acknowledge_all()
+        with self.lock:
+            self.alert_system.acknowledge_all()
     
     def record_break(self, break_type: BreakType):
-        self.screen_time_tracker.record_break_taken(break_type)
+        with self.lock:
+            self.screen_time_tracker.record_break_taken(break_type)
     
     def pause_alerts(self, minutes: int):
-        self.alert_system.pause_alerts(minutes * 60)
+        with self.lock:
+            self.alert_system.pause_alerts(minutes * 60)
     
     def get_trend_analysis(self, days: int = 7):
         return self.data_logger.get_trend_analysis(days)
     
     def get_baselines(self):
         return self.data_logger.get_baselines()
+
+class InferenceWorker(threading.Thread):
+    def __init__(self, monitor: HealthMonitor):
+        super().__init__(daemon=True)
+        self.monitor = monitor
+        self.results: deque = deque(maxlen=1)
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.last_process_time = 0.0
+    
+    def run(self):
+        while not self.stopped.is_set():
+            start = time.monotonic()
+            health_state = self.monitor.process_frame()
+            if health_state is None:
+                continue
+            
+            frame = self.monitor.get_annotated_frame()
+            with self.lock:
+                self.results.append((health_state, frame))
+            self.last_process_time = time.monotonic() - start
+    
+    def get_result(self) -> Optional[Tuple[HealthState, Optional[np.ndarray]]]:
+        with self.lock:
+            if not self.results:
+                return None
+            return self.results.pop()
+    
+    def stop(self):
+        self.stopped.set()
+        if self.is_alive():
+            self.join(timeout=2.0)
@@ -1,15 +1,33 @@
 import time
+import bisect
+import math
 from collections import deque
 from dataclasses import dataclass
 from typing import Optional, Tuple, List
 from enum import Enum
 import numpy as np
 
+from .jit import njit
+from .text_cache import format_text
+
+_fabs = math.fabs
+
+ISSUE_FORWARD_HEAD = 1
+ISSUE_HEAD_TILTED_BACK = 2
+ISSUE_HEAD_ROLLED = 4
+ISSUE_HEAD_TURNED = 8
+ISSUE_TOO_CLOSE = 16
+ISSUE_SLIGHTLY_CLOSE = 32
+ISSUE_PROLONGED_BAD_POSTURE = 64
+
 class PostureStatus(Enum):
     GOOD = "good"
     WARNING = "warning"
     POOR = "poor"
 
+_STATUS_THRESHOLDS = (40, 70)
+_STATUS_LEVELS = (PostureStatus.POOR, PostureStatus.WARNING, PostureStatus.GOOD)
+
 @dataclass
 class PostureMetrics:
     head_pitch: float
@@ -21,6 +39,60 @@ class PostureMetrics:
     issues: List[str]
     bad_posture_duration: float
 
+@njit(cache=True)
+def _posture_score_kernel(
+    pitch_deviation: float,
+    roll_deviation: float,
+    yaw_deviation: float,
+    distance: float,
+    bad_posture_duration: float,
+    thresholds: Tuple[float, ...],
+    poor_below: float,
+    good_at: float
+) -> float:
+    (forward_critical, forward_warning, roll_critical, roll_warning, tilt_critical, tilt_warning,
+     critical_distance, warning_distance, ideal_min, ideal_max) = thresholds
+    score = 100.0
+    
+    if pitch_deviation > forward_critical:
+        score -= 30
+    elif pitch_deviation > forward_warning:
+        score -= 15
+    if score < poor_below:
+        return score
+    
+    if roll_deviation > roll_critical:
+        score -= 25
+    elif roll_deviation > roll_warning:
+        score -= 12
+    if score < poor_below:
+        return score
+    
+    if yaw_deviation > tilt_critical:
+        score -= 20
+    elif yaw_deviation > tilt_warning:
+        score -= 10
+    if score < poor_below:
+        return score
+    
+    if distance < critical_distance:
+        score -= 30
+    elif distance < warning_distance:
+        score -= 15
+    elif distance < ideal_min:
+        score -= 5
+    elif distance > ideal_max + 30:
+        score -= 10
+    if score < poor_below or score - 15 >= good_at:
+        return score
+    
+    if bad_posture_duration > 120:
+        score -= 15
+    elif bad_posture_duration > 60:
+        score -= 8
+    
+    return max(0.0, score)
+
 class PostureAnalyzer:
     IDEAL_DISTANCE_MIN = 30
     IDEAL_DISTANCE_MAX = 50
@@ -33,34 +105,65 @@ class PostureAnalyzer:
     HEAD_ROLL_WARNING = 15
     HEAD_ROLL_CRITICAL = 25
     BAD_POSTURE_ALERT_THRESHOLD = 30
+    CALIBRATION_FPS_ESTIMATE = 30
     
     def __init__(self):
         self.pitch_history: deque = deque(maxlen=30)
         self.yaw_history: deque = deque(maxlen=30)
         self.roll_history: deque = deque(maxlen=30)
         self.distance_history: deque = deque(maxlen=30)
+        self._pitch_sum = 0.0
+        self._yaw_sum = 0.0
+        self._roll_sum = 0.0
+        self._distance_sum = 0.0
+        self._tick = 0
+        self._smoothed_tick = -1
+        self._cached_smoothed: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 50.0)
         self.baseline_pitch: Optional[float] = None
         self.baseline_yaw: Optional[float] = None
         self.baseline_distance: Optional[float] = None
-        self.calibration_data: List[Tuple[float, float, float, float]] = []
         self.is_calibrating = True
         self.calibration_start_time = time.time()
         self.calibration_duration = 30
+        self._calib_buf = np.empty((self.calibration_duration * self.CALIBRATION_FPS_ESTIMATE, 4), dtype=np.float32)
+        self._calib_n = 0
         self.bad_posture_start_time: Optional[float] = None
         self.current_bad_posture_duration = 0.0
         self.total_bad_posture_time = 0.0
+        self._issue_flags = 0
+        self._score_thresholds = tuple(float(t) for t in (
+            self.FORWARD_HEAD_CRITICAL, self.FORWARD_HEAD_WARNING,
+            self.HEAD_ROLL_CRITICAL, self.HEAD_ROLL_WARNING,
+            self.HEAD_TILT_CRITICAL, self.HEAD_TILT_WARNING,
+            self.CRITICAL_DISTANCE_MIN, self.WARNING_DISTANCE_MIN,
+            self.IDEAL_DISTANCE_MIN, self.IDEAL_DISTANCE_MAX
+        ))
         
-    def update(self, head_pose: Tuple[float, float, float], distance: float):
+    def update(self, head_pose: Tuple[float, float, float], distance: float, now: Optional[float] = None):
         pitch, yaw, roll = head_pose
-        current_time = time.time()
+        current_time = time.time() if now is None else now
+        
+        if len(self.pitch_history) == self.pitch_history.maxlen:
+            self._pitch_sum -= self.pitch_history[0]
+            self._yaw_sum -= self.yaw_history[0]
+            self._roll_sum -= self.roll_history[0]
+            self._distance_sum -= self.distance_history[0]
         
         self.pitch_history.append(pitch)
         self.yaw_history.append(yaw)
         self.roll_history.append(roll)
         self.distance_history.append(distance)
+        self._pitch_sum += pitch
+        self._yaw_sum += yaw
+        self._roll_sum += roll
+        self._distance_sum += distance
+        self._tick += 1
         
         if self.is_calibrating:
-            self.calibration_data.append((pitch, yaw, roll, distance))
+            if self._calib_n == len(self._calib_buf):
+                self._calib_buf = np.concatenate((self._calib_buf, np.empty_like(self._calib_buf)))
+            self._calib_buf[self._calib_n] = (pitch, yaw, roll, distance)
+            self._calib_n += 1
             if current_time - self.calibration_start_time >= self.calibration_duration:
                 self._complete_calibration()
         
@@ -76,101 +179,88 @@ class PostureAnalyzer:
             self.current_bad_posture_duration = 0.0
     
     def _complete_calibration(self):
-        if len(self.calibration_data) >= 10:
-            pitches = [d[0] for d in self.calibration_data]
-            yaws = [d[1] for d in self.calibration_data]
-            distances = [d[3] for d in self.calibration_data]
-            
-            self.baseline_pitch = float(np.median(pitches))
-            self.baseline_yaw = float(np.median(yaws))
-            self.baseline_distance = float(np.median(distances))
+        if self._calib_n >= 10:
+            medians = np.median(self._calib_buf[:self._calib_n], axis=0)
+            self.baseline_pitch, self.baseline_yaw, _, self.baseline_distance = medians.tolist()
         
         self.is_calibrating = False
-        self.calibration_data = []
+        self._calib_buf = np.empty((0, 4), dtype=np.float32)
+        self._calib_n = 0
     
     def get_smoothed_values(self) -> Tuple[float, float, float, float]:
-        pitch = float(np.mean(list(self.pitch_history))) if self.pitch_history else 0.0
-        yaw = float(np.mean(list(self.yaw_history))) if self.yaw_history else 0.0
-        roll = float(np.mean(list(self.roll_history))) if self.roll_history else 0.0
-        distance = float(np.mean(list(self.distance_history))) if self.distance_history else 50.0
+        if self._smoothed_tick == self._tick:
+            return self._cached_smoothed
         
-        return pitch, yaw, roll, distance
+        count = len(self.pitch_history)
+        if count:
+            self._cached_smoothed = (
+                float(self._pitch_sum / count),
+                float(self._yaw_sum / count),
+                float(self._roll_sum / count),
+                float(self._distance_sum / count)
+            )
+        self._smoothed_tick = self._tick
+        return self._cached_smoothed
     
     def calculate_posture_score(self) -> float:
+        return self._score(-1.0, 101.0)
+    
+    def _score(self, poor_below: float, good_at: float) -> float:
         pitch, yaw, roll, distance = self.get_smoothed_values()
-        score = 100.0
-        
-        pitch_deviation = abs(pitch - (self.baseline_pitch or 0))
-        if pitch_deviation > self.FORWARD_HEAD_CRITICAL:
-            score -= 30
-        elif pitch_deviation > self.FORWARD_HEAD_WARNING:
-            score -= 15
-        
-        roll_deviation = abs(roll)
-        if roll_deviation > self.HEAD_ROLL_CRITICAL:
-            score -= 25
-        elif roll_deviation > self.HEAD_ROLL_WARNING:
-            score -= 12
-        
-        yaw_deviation = abs(yaw - (self.baseline_yaw or 0))
-        if yaw_deviation > self.HEAD_TILT_CRITICAL:
-            score -= 20
-        elif yaw_deviation > self.HEAD_TILT_WARNING:
-            score -= 10
-        
-        if distance < self.CRITICAL_DISTANCE_MIN:
-            score -= 30
-        elif distance < self.WARNING_DISTANCE_MIN:
-            score -= 15
-        elif distance < self.IDEAL_DISTANCE_MIN:
-            score -= 5
-        elif distance > self.IDEAL_DISTANCE_MAX + 30:
-            score -= 10
         
-        if self.current_bad_posture_duration > 120:
-            score -= 15
-        elif self.current_bad_posture_duration > 60:
-            score -= 8
-        
-        return max(0, score)
+        return _posture_score_kernel(
+            _fabs(pitch - (self.baseline_pitch or 0)),
+            _fabs(roll),
+            _fabs(yaw - (self.baseline_yaw or 0)),
+            distance,
+            float(self.current_bad_posture_duration),
+            self._score_thresholds,
+            poor_below,
+            good_at
+        )
+    
+    def _score_fastpath(self) -> float:
+        poor, good = _STATUS_THRESHOLDS
+        return self._score(float(poor), float(good))
     
     def get_issues(self) -> List[str]:
         pitch, yaw, roll, distance = self.get_smoothed_values()
         issues = []
+        flags = 0
         
         pitch_deviation = pitch - (self.baseline_pitch or 0)
         if pitch_deviation > self.FORWARD_HEAD_WARNING:
             issues.append("Forward head posture detected")
+            flags |= ISSUE_FORWARD_HEAD
         elif pitch_deviation < -self.FORWARD_HEAD_WARNING:
             issues.append("Head tilted back too far")
+            flags |= ISSUE_HEAD_TILTED_BACK
         
-        if abs(roll) > self.HEAD_ROLL_WARNING:
-            direction = "right" if roll > 0 else "left"
-            issues.append(f"Head tilted to the {direction}")
+        if _fabs(roll) > self.HEAD_ROLL_WARNING:
+            issues.append("Head tilted to the right" if roll > 0 else "Head tilted to the left")
+            flags |= ISSUE_HEAD_ROLLED
         
-        yaw_deviation = abs(yaw - (self.baseline_yaw or 0))
+        yaw_deviation = _fabs(yaw - (self.baseline_yaw or 0))
         if yaw_deviation > self.HEAD_TILT_WARNING:
-            direction = "right" if yaw > 0 else "left"
-            issues.append(f"Head turned to the {direction}")
+            issues.append("Head turned to the right" if yaw > 0 else "Head turned to the left")
+            flags |= ISSUE_HEAD_TURNED
         
         if distance < self.WARNING_DISTANCE_MIN:
-            issues.append(f"Too close to screen ({distance:.0f}cm)")
+            issues.append(format_text("Too close to screen ({:.0f}cm)", round(distance)))
+            flags |= ISSUE_TOO_CLOSE
         elif distance < self.IDEAL_DISTANCE_MIN:
-            issues.append(f"Consider moving back slightly ({distance:.0f}cm)")
+            issues.append(format_text("Consider moving back slightly ({:.0f}cm)", round(distance)))
+            flags |= ISSUE_SLIGHTLY_CLOSE
         
         if self.current_bad_posture_duration > 60:
-            issues.append(f"Poor posture for {self.current_bad_posture_duration:.0f} seconds")
+            issues.append(format_text("Poor posture for {:.0f} seconds", round(self.current_bad_posture_duration)))
+            flags |= ISSUE_PROLONGED_BAD_POSTURE
         
+        self._issue_flags = flags
         return issues
     
     def get_status(self) -> PostureStatus:
-        score = self.calculate_posture_score()
-        
-        if score >= 70:
-            return PostureStatus.GOOD
-        elif score >= 40:
-            return PostureStatus.WARNING
-        return PostureStatus.POOR
+        return _STATUS_LEVELS[bisect.bisect_right(_STATUS_THRESHOLDS, self._score_fastpath())]
     
     def get_metrics(self) -> PostureMetrics:
         pitch, yaw, roll, distance = self.get_smoothed_values()
@@ -192,7 +282,7 @@ class PostureAnalyzer:
         if metrics.status == PostureStatus.POOR:
             if metrics.distance_from_screen < self.WARNING_DISTANCE_MIN:
                 return "You're too close to the screen. Move back to at least 50cm for better eye and posture health."
-            if "Forward head posture" in str(metrics.issues):
+            if self._issue_flags & ISSUE_FORWARD_HEAD:
                 return "Your head is leaning forward. Sit back and align your ears with your shoulders."
             if metrics.bad_posture_duration > 60:
                 return "You've had poor posture for over a minute. Take a moment to sit up straight and reset your position."
@@ -201,7 +291,7 @@ class PostureAnalyzer:
         elif metrics.status == PostureStatus.WARNING:
             issues = metrics.issues
             if issues:
-                return f"Minor posture issue: {issues[0]}. Make a small adjustment."
+                return format_text("Minor posture issue: {}. Make a small adjustment.", issues[0])
         
         return None
     
@@ -1,37 +1,93 @@
 import time
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from enum import Enum
 import json
 from datetime import datetime, timedelta
+import numpy as np
+
+from .text_cache import format_text
+
+COMPLIANCE_HISTORY_SIZE = 20
+_COMPLIANCE_DTYPE = np.dtype([("type", "u1"), ("ts", "f8"), ("work_dur", "f4")])
+
+def _midnight_ts_after(ts: float) -> float:
+    next_day = datetime.fromtimestamp(ts).date() + timedelta(days=1)
+    return datetime.combine(next_day, datetime.min.time()).timestamp()
 
 class BreakType(Enum):
     MICRO = "micro"
     SHORT = "short"
     LONG = "long"
 
-@dataclass
+_BREAK_TYPE_CODES = {BreakType.MICRO: 0, BreakType.SHORT: 1, BreakType.LONG: 2}
+
+@dataclass(slots=True)
 class WorkSession:
     start_time: float
     end_time: Optional[float] = None
     breaks_taken: int = 0
+    duration: float = 0.0
+    duration_minutes: float = 0.0
     
-    @property
-    def duration(self) -> float:
-        end = self.end_time or time.time()
+    def duration_at(self, now: float) -> float:
+        end = self.end_time or now
         return end - self.start_time
     
-    @property
-    def duration_minutes(self) -> float:
-        return self.duration / 60
+    def close(self, end_time: float):
+        self.end_time = end_time
+        self.duration = end_time - self.start_time
+        self.duration_minutes = self.duration / 60
 
-@dataclass
+@dataclass(slots=True)
 class BreakRecommendation:
     break_type: BreakType
     duration_seconds: int
     reason: str
-    exercises: List[str]
+    exercises: Sequence[str]
+
+_LONG_BREAK_REASON = "You've been working for {:.0f} minutes. Time for a longer break."
+_SHORT_BREAK_REASON = "You've been working for {:.0f} minutes. Take a short break."
+
+_LONG_BREAK_EXERCISES = (
+    "Stand up and stretch your whole body",
+    "Take a short walk",
+    "Do some light exercises or yoga",
+    "Get a healthy snack and water",
+    "Look out a window at distant objects"
+)
+
+_SHORT_BREAK_EXERCISES = (
+    "Stand up and stretch your arms overhead",
+    "Roll your shoulders backwards 10 times",
+    "Tilt your head side to side gently",
+    "Take 5 deep breaths",
+    "Walk around for a minute"
+)
+
+_MICRO_BREAK_REASON = "Time for the 20-20-20 rule: Look at something 20 feet away for 20 seconds."
+
+_MICRO_BREAK_EXERCISES = (
+    "Look at a distant object for 20 seconds",
+    "Blink 20 times slowly",
+    "Close your eyes and take 3 deep breaths"
+)
+
+_DAILY_RULES = (
+    (
+        lambda stats: stats["total_screen_time_today_minutes"] > 480,
+        "You've had a long screen day. Consider ending work soon and resting your eyes."
+    ),
+    (
+        lambda stats: stats["average_session_minutes"] > 60,
+        "Your average session length is quite long. Try taking more frequent breaks."
+    ),
+    (
+        lambda stats: stats["breaks_taken_today"] < stats["total_screen_time_today_minutes"] / 30,
+        "You could benefit from more frequent breaks throughout the day."
+    )
+)
 
 class ScreenTimeTracker:
     MICRO_BREAK_INTERVAL = 20 * 60
@@ -42,69 +98,102 @@ class ScreenTimeTracker:
     LONG_BREAK_DURATION = 15 * 60
     IDLE_THRESHOLD = 30
     ACTIVE_THRESHOLD = 5
+    DAY_CHECK_INTERVAL = 60
     
     def __init__(self):
         self.current_session: Optional[WorkSession] = None
-        self.sessions_today: List[WorkSession] = []
-        self.last_activity_time = time.time()
+        self._n_sessions = 0
+        self._session_breaks_total = 0
+        self.last_activity_time = time.monotonic()
         self.is_user_present = False
         self.continuous_work_time = 0.0
-        self.last_micro_break = time.time()
-        self.last_short_break = time.time()
-        self.last_long_break = time.time()
+        self.last_micro_break = time.monotonic()
+        self.last_short_break = time.monotonic()
+        self.last_long_break = time.monotonic()
         self.total_screen_time_today = 0.0
         self.last_reset_date = datetime.now().date()
+        self._next_reset_check = 0.0
         self.idle_periods: deque = deque(maxlen=50)
-        self.break_compliance_history: deque = deque(maxlen=20)
-        
-    def update(self, face_detected: bool):
-        current_time = time.time()
-        
-        self._check_daily_reset()
-        
-        if face_detected:
-            if not self.is_user_present:
-                self._start_session()
-            self.is_user_present = True
-            self.last_activity_time = current_time
-            
-            if self.current_session:
-                time_since_start = current_time - self.current_session.start_time
-                self.continuous_work_time = time_since_start
-        else:
-            idle_time = current_time - self.last_activity_time
-            if idle_time >= self.IDLE_THRESHOLD:
-                if self.is_user_present:
-                    self._end_session()
-                    self.idle_periods.append({
-                        "start": self.last_activity_time,
-                        "duration": idle_time
-                    })
-                self.is_user_present = False
+        self._compliance = np.zeros(COMPLIANCE_HISTORY_SIZE, dtype=_COMPLIANCE_DTYPE)
+        self._comp_head = 0
+        self._comp_count = 0
+        self._rec_cache_key: Optional[tuple] = None
+        self._rec_cache: Optional[BreakRecommendation] = None
+        self._stats_cache_key: Optional[tuple] = None
+        self._stats_cache: dict = {}
+        self._micro_recommendation = BreakRecommendation(
+            break_type=BreakType.MICRO,
+            duration_seconds=self.MICRO_BREAK_DURATION,
+            reason=_MICRO_BREAK_REASON,
+            exercises=_MICRO_BREAK_EXERCISES
+        )
+        self._update_handlers = (self._on_absent, self._on_leaving, self._on_arrival, self._on_present)
+        
+    def update(self, face_detected: bool, now: Optional[float] = None):
+        current_time = time.monotonic() if now is None else now
+        
+        self._check_daily_reset(current_time)
+        
+        self._update_handlers[(face_detected << 1) | self.is_user_present](current_time)
+    
+    def _on_absent(self, current_time: float):
+        pass
+    
+    def _on_leaving(self, current_time: float):
+        idle_time = current_time - self.last_activity_time
+        if idle_time >= self.IDLE_THRESHOLD:
+            self._end_session(current_time)
+            self.idle_periods.append({
+                "start": self.last_activity_time,
+                "duration": idle_time
+            })
+            self.is_user_present = False
+    
+    def _on_arrival(self, current_time: float):
+        self._start_session(current_time)
+        self.is_user_present = True
+        self._on_present(current_time)
+    
+    def _on_present(self, current_time: float):
+        self.last_activity_time = current_time
+        if self.current_session:
+            self.continuous_work_time = current_time - self.current_session.start_time
     
-    def _check_daily_reset(self):
-        today = datetime.now().date()
+    def _check_daily_reset(self, current_time: float):
+        if current_time < self._next_reset_check:
+            return
+        
+        wall_time = time.time()
+        self._next_reset_check = current_time + min(
+            self.DAY_CHECK_INTERVAL, _midnight_ts_after(wall_time) - wall_time
+        )
+        
+        today = datetime.fromtimestamp(wall_time).date()
         if today != self.last_reset_date:
-            self.sessions_today = []
+            self._n_sessions = 0
+            self._session_breaks_total = 0
             self.total_screen_time_today = 0.0
             self.last_reset_date = today
     
-    def _start_session(self):
+    def _start_session(self, current_time: Optional[float] = None):
+        if current_time is None:
+            current_time = time.monotonic()
         if self.current_session:
-            self._end_session()
+            self._end_session(current_time)
         
-        self.current_session = WorkSession(start_time=time.time())
+        self.current_session = WorkSession(start_time=current_time)
         self.continuous_work_time = 0.0
     
-    def _end_session(self):
+    def _end_session(self, current_time: Optional[float] = None):
         if self.current_session:
-            self.current_session.end_time = time.time()
-            self.sessions_today.append(self.current_session)
+            self.current_session.close(time.monotonic() if current_time is None else current_time)
+            self._n_sessions += 1
+            self._session_breaks_total += self.current_session.breaks_taken
             self.total_screen_time_today += self.current_session.duration
             self.current_session = None
     
     def record_break_taken(self, break_type: BreakType):
-        current_time = time.time()
+        current_time = time.monotonic()
         
         if break_type == BreakType.MICRO:
             self.last_micro_break = current_time
@@ -119,100 +208,99 @@ class ScreenTimeTracker:
         if self.current_session:
             self.current_session.breaks_taken += 1
         
-        self.break_compliance_history.append({
-            "type": break_type.value,
-            "timestamp": current_time,
-            "work_duration": self.continuous_work_time
-        })
+        self._compliance[self._comp_head] = (_BREAK_TYPE_CODES[break_type], current_time, self.continuous_work_time)
+        self._comp_head = (self._comp_head + 1) % COMPLIANCE_HISTORY_SIZE
+        self._comp_count = min(self._comp_count + 1, COMPLIANCE_HISTORY_SIZE)
         
         self.continuous_work_time = 0.0
     
-    def get_break_recommendation(self) -> Optional[BreakRecommendation]:
-        current_time = time.time()
+    def get_break_recommendation(self, now: Optional[float] = None) -> Optional[BreakRecommendation]:
+        current_time = time.monotonic() if now is None else now
+        
+        key = (int(current_time), self.last_micro_break, self.last_short_break, self.last_long_break)
+        if key == self._rec_cache_key:
+            return self._rec_cache
+        
+        recommendation = None
         
         time_since_long = current_time - self.last_long_break
+        time_since_short = current_time - self.last_short_break
         if time_since_long >= self.LONG_BREAK_INTERVAL:
-            return BreakRecommendation(
+            recommendation = BreakRecommendation(
                 break_type=BreakType.LONG,
                 duration_seconds=self.LONG_BREAK_DURATION,
-                reason=f"You've been working for {time_since_long/60:.0f} minutes. Time for a longer break.",
-                exercises=[
-                    "Stand up and stretch your whole body",
-                    "Take a short walk",
-                    "Do some light exercises or yoga",
-                    "Get a healthy snack and water",
-                    "Look out a window at distant objects"
-                ]
+                reason=format_text(_LONG_BREAK_REASON, round(time_since_long / 60)),
+                exercises=_LONG_BREAK_EXERCISES
             )
-        
-        time_since_short = current_time - self.last_short_break
-        if time_since_short >= self.SHORT_BREAK_INTERVAL:
-            return BreakRecommendation(
+        elif time_since_short >= self.SHORT_BREAK_INTERVAL:
+            recommendation = BreakRecommendation(
                 break_type=BreakType.SHORT,
                 duration_seconds=self.SHORT_BREAK_DURATION,
-                reason=f"You've been working for {time_since_short/60:.0f} minutes. Take a short break.",
-                exercises=[
-                    "Stand up and stretch your arms overhead",
-                    "Roll your shoulders backwards 10 times",
-                    "Tilt your head side to side gently",
-                    "Take 5 deep breaths",
-                    "Walk around for a minute"
-                ]
-            )
-        
-        time_since_micro = current_time - self.last_micro_break
-        if time_since_micro >= self.MICRO_BREAK_INTERVAL:
-            return BreakRecommendation(
-                break_type=BreakType.MICRO,
-                duration_seconds=self.MICRO_BREAK_DURATION,
-                reason="Time for the 20-20-20 rule: Look at something 20 feet away for 20 seconds.",
-                exercises=[
-                    "Look at a distant object for 20 seconds",
-                    "Blink 20 times slowly",
-                    "Close your eyes and take 3 deep breaths"
-                ]
+                reason=format_text(_SHORT_BREAK_REASON, round(time_since_short / 60)),
+                exercises=_SHORT_BREAK_EXERCISES
             )
+        elif current_time - self.last_micro_break >= self.MICRO_BREAK_INTERVAL:
+            recommendation = self._micro_recommendation
         
-        return None
+        self._rec_cache_key = key
+        self._rec_cache = recommendation
+        return recommendation
     
-    def get_statistics(self) -> dict:
+    def get_statistics(self, now: Optional[float] = None) -> dict:
+        if now is None:
+            now = time.monotonic()
+        key = (
+            int(now),
+            self._n_sessions,
+            self.current_session is None,
+            self.is_user_present,
+            self.last_micro_break
+        )
+        if key == self._stats_cache_key:
+            return self._stats_cache
+        
         current_session_time = 0
         if self.current_session:
-            current_session_time = self.current_session.duration
+            current_session_time = self.current_session.duration_at(now)
         
         total_today = self.total_screen_time_today + current_session_time
         
-        session_durations = [s.duration_minutes for s in self.sessions_today]
-        if self.current_session:
-            session_durations.append(self.current_session.duration_minutes)
+        sessions_count = self._n_sessions + (1 if self.current_session else 0)
         
-        avg_session = sum(session_durations) / len(session_durations) if session_durations else 0
+        avg_session = total_today / 60 / sessions_count if sessions_count else 0
         
-        total_breaks = sum(s.breaks_taken for s in self.sessions_today)
+        total_breaks = self._session_breaks_total
         if self.current_session:
             total_breaks += self.current_session.breaks_taken
         
-        return {
+        time_until_micro = max(0, self.MICRO_BREAK_INTERVAL - (now - self.last_micro_break))
+        time_until_short = max(0, self.SHORT_BREAK_INTERVAL - (now - self.last_short_break))
+        time_until_long = max(0, self.LONG_BREAK_INTERVAL - (now - self.last_long_break))
+        
+        self._stats_cache_key = key
+        self._stats_cache = {
             "total_screen_time_today_minutes": total_today / 60,
             "current_session_minutes": current_session_time / 60,
             "continuous_work_minutes": self.continuous_work_time / 60,
-            "sessions_count": len(self.sessions_today) + (1 if self.current_session else 0),
+            "sessions_count": sessions_count,
             "average_session_minutes": avg_session,
             "breaks_taken_today": total_breaks,
             "is_user_present": self.is_user_present,
-            "time_until_micro_break": max(0, self.MICRO_BREAK_INTERVAL - (time.time() - self.last_micro_break)),
-            "time_until_short_break": max(0, self.SHORT_BREAK_INTERVAL - (time.time() - self.last_short_break)),
-            "time_until_long_break": max(0, self.LONG_BREAK_INTERVAL - (time.time() - self.last_long_break))
+            "time_until_micro_break": time_until_micro,
+            "time_until_short_break": time_until_short,
+            "time_until_long_break": time_until_long,
+            "time_until_next_break": min(time_until_micro, time_until_short, time_until_long)
         }
+        return self._stats_cache
     
     def get_daily_summary(self) -> dict:
         stats = self.get_statistics()
         
         compliance_rate = 0
-        if self.break_compliance_history:
-            recent = list(self.break_compliance_history)
-            on_time = sum(1 for b in recent if b["work_duration"] < self.SHORT_BREAK_INTERVAL * 1.2)
-            compliance_rate = on_time / len(recent) * 100
+        if self._comp_count:
+            recent = self._compliance["work_dur"][:self._comp_count]
+            on_time = int(np.count_nonzero(recent < self.SHORT_BREAK_INTERVAL * 1.2))
+            compliance_rate = on_time / self._comp_count * 100
         
         return {
             "date": datetime.now().strftime("%Y-%m-%d"),
@@ -224,15 +312,4 @@ class ScreenTimeTracker:
         }
     
     def _generate_daily_recommendations(self, stats: dict) -> List[str]:
-        recommendations = []
-        
-        if stats["total_screen_time_today_minutes"] > 480:
-            recommendations.append("You've had a long screen day. Consider ending work soon and resting your eyes.")
-        
-        if stats["average_session_minutes"] > 60:
-            recommendations.append("Your average session length is quite long. Try taking more frequent breaks.")
-        
-        if stats["breaks_taken_today"] < stats["total_screen_time_today_minutes"] / 30:
-            recommendations.append("You could benefit from more frequent breaks throughout the day.")
-        
-        return recommendations
+        return [message for applies, message in _DAILY_RULES if applies(stats)]
@@ -0,0 +1,7 @@
+from functools import lru_cache
+
+TEXT_CACHE_SIZE = 256
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def format_text(template: str, value) -> str:
+    return template.format(value)
@@ -1,22 +1,91 @@
+import math
+import sys
+import time
+import threading
 import cv2
 import mediapipe as mp
 import numpy as np
-from dataclasses import dataclass
-from typing import Optional, Tuple, List
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
 
-@dataclass
+from .jit import njit, NUMBA_AVAILABLE
+
+AVERAGE_EYE_DISTANCE_CM = 6.3
+FOCAL_LENGTH_ESTIMATE = 600
+
+_PLATFORM_BACKENDS = {
+    "win32": cv2.CAP_MSMF,
+    "linux": cv2.CAP_V4L2,
+    "darwin": cv2.CAP_AVFOUNDATION
+}
+
+@dataclass(slots=True)
 class FaceLandmarks:
-    landmarks: List[Tuple[float, float, float]]
+    landmarks: np.ndarray
     image_width: int
     image_height: int
+    scale: np.ndarray = field(init=False, repr=False)
+    px: np.ndarray = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.scale = np.array([self.image_width, self.image_height, 1], dtype=np.float32)
+        self.px = (self.landmarks[:, :2] * self.scale[:2]).astype(np.int32)
     
     def get_landmark(self, index: int) -> Tuple[int, int]:
-        lm = self.landmarks[index]
-        return (int(lm[0] * self.image_width), int(lm[1] * self.image_height))
+        x, y = self.px[index].tolist()
+        return (x, y)
     
     def get_landmark_3d(self, index: int) -> Tuple[float, float, float]:
-        lm = self.landmarks[index]
-        return (lm[0] * self.image_width, lm[1] * self.image_height, lm[2])
+        x, y, z = (self.landmarks[index] * self.scale).tolist()
+        return (x, y, z)
+
+@njit(cache=True, fastmath=True)
+def _face_metrics_kernel(
+    lm: np.ndarray,
+    width: int,
+    height: int,
+    idx: np.ndarray
+) -> Tuple[float, float, float, float, float, float]:
+    ears = np.zeros(2)
+    for eye in range(2):
+        base = eye * 4
+        top_x = int(lm[idx[base], 0] * width)
+        top_y = int(lm[idx[base], 1] * height)
+        bottom_x = int(lm[idx[base + 1], 0] * width)
+        bottom_y = int(lm[idx[base + 1], 1] * height)
+        outer_x = int(lm[idx[base + 2], 0] * width)
+        outer_y = int(lm[idx[base + 2], 1] * height)
+        inner_x = int(lm[idx[base + 3], 0] * width)
+        inner_y = int(lm[idx[base + 3], 1] * height)
+        
+        vertical_dist = math.hypot(top_x - bottom_x, top_y - bottom_y)
+        horizontal_dist = math.hypot(outer_x - inner_x, outer_y - inner_y)
+        if horizontal_dist != 0:
+            ears[eye] = vertical_dist / horizontal_dist
+    
+    chin, forehead, left_eye, right_eye = idx[8], idx[9], idx[10], idx[11]
+    
+    roll = math.degrees(math.atan2(
+        (lm[right_eye, 1] - lm[left_eye, 1]) * height,
+        (lm[right_eye, 0] - lm[left_eye, 0]) * width
+    ))
+    pitch = math.degrees(math.atan2(
+        (lm[chin, 0] - lm[forehead, 0]) * width,
+        (lm[chin, 1] - lm[forehead, 1]) * height
+    ))
+    
+    face_center_x = (lm[left_eye, 0] * width + lm[right_eye, 0] * width) / 2
+    frame_center = width / 2
+    yaw = ((face_center_x - frame_center) / frame_center) * 30
+    
+    eye_dx = int(lm[left_eye, 0] * width) - int(lm[right_eye, 0] * width)
+    eye_dy = int(lm[left_eye, 1] * height) - int(lm[right_eye, 1] * height)
+    eye_distance_px = math.hypot(eye_dx, eye_dy)
+    distance = 0.0
+    if eye_distance_px > 0:
+        distance = (AVERAGE_EYE_DISTANCE_CM * FOCAL_LENGTH_ESTIMATE) / eye_distance_px
+    
+    return ears[0], ears[1], pitch, yaw, roll, distance
 
 class VisionEngine:
     LEFT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
@@ -34,8 +103,19 @@ class VisionEngine:
     FOREHEAD = 10
     LEFT_SHOULDER_APPROX = 234
     RIGHT_SHOULDER_APPROX = 454
+    EYE_POINT_INDICES = np.array(LEFT_EYE_INDICES + RIGHT_EYE_INDICES, dtype=np.int32)
+    FEATURE_POINT_INDICES = np.array([NOSE_TIP, CHIN, FOREHEAD], dtype=np.int32)
+    FACE_METRIC_INDICES = np.array([
+        LEFT_EYE_TOP, LEFT_EYE_BOTTOM, LEFT_EYE_INDICES[3], LEFT_EYE_INDICES[0],
+        RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM, RIGHT_EYE_INDICES[3], RIGHT_EYE_INDICES[0],
+        CHIN, FOREHEAD, LEFT_EYE_OUTER, RIGHT_EYE_OUTER
+    ], dtype=np.int32)
+    
+    PROCESS_BUDGET = 1 / 30
+    MAX_FRAME_SKIP = 3
+    FRAME_TIMEOUT = 0.1
     
-    def __init__(self):
+    def __init__(self, refine: bool = False):
         self.mp_face_mesh = mp.solutions.face_mesh
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
@@ -43,22 +123,49 @@ class VisionEngine:
         self.face_mesh = self.mp_face_mesh.FaceMesh(
             static_image_mode=False,
             max_num_faces=1,
-            refine_landmarks=True,
+            refine_landmarks=refine,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
         
         self.cap = None
         self.is_running = False
+        self._capture_thread: Optional[CaptureThread] = None
+        self._rgb_buf: Optional[np.ndarray] = None
+        self._frame_skip = 0
+        self._frame_count = 0
+        self._last_result: Optional[FaceLandmarks] = None
         
+        if NUMBA_AVAILABLE:
+            threading.Thread(target=self._prewarm_kernels, daemon=True).start()
+    
+    def _prewarm_kernels(self):
+        _face_metrics_kernel(np.zeros((468, 3), dtype=np.float32), 640, 480, self.FACE_METRIC_INDICES)
+    
+    def _open_capture(self, camera_index: int) -> cv2.VideoCapture:
+        backend = _PLATFORM_BACKENDS.get(sys.platform)
+        if backend is not None:
+            try:
+                cap = cv2.VideoCapture(camera_index, backend)
+                if cap.isOpened():
+                    return cap
+                cap.release()
+            except Exception:
+                pass
+        return cv2.VideoCapture(camera_index)
+    
     def start_camera(self, camera_index: int = 0) -> bool:
         try:
-            self.cap = cv2.VideoCapture(camera_index)
+            self.cap = self._open_capture(camera_index)
             if not self.cap.isOpened():
                 return False
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
             self.is_running = True
+            self._capture_thread = CaptureThread(self)
+            self._capture_thread.start()
             return True
         except Exception as e:
             print(f"Camera initialization failed: {e}")
@@ -66,11 +173,19 @@ class VisionEngine:
     
     def stop_camera(self):
         self.is_running = False
+        if self._capture_thread:
+            self._capture_thread.stop()
+            self._capture_thread = None
         if self.cap:
             self.cap.release()
             self.cap = None
     
-    def get_frame(self) -> Optional[np.ndarray]:
+    def get_frame(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        if not self._capture_thread:
+            return None
+        return self._capture_thread.read(self.FRAME_TIMEOUT if timeout is None else timeout)
+    
+    def _read_camera(self) -> Optional[np.ndarray]:
         if not self.cap or not self.is_running:
             return None
         ret, frame = self.cap.read()
@@ -81,14 +196,40 @@ class VisionEngine:
     def process_frame(self, frame: np.ndarray) -> Optional[FaceLandmarks]:
         if frame is None:
             return None
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
+        
+        self._frame_count += 1
+        if self._frame_count % (self._frame_skip + 1):
+            return self._last_result
+        
+        start = time.perf_counter()
+        self._last_result = self._detect(frame)
+        self._adapt_frame_skip(time.perf_counter() - start)
+        return self._last_result
+    
+    def _adapt_frame_skip(self, elapsed: float):
+        if elapsed > self.PROCESS_BUDGET:
+            self._frame_skip = min(self._frame_skip + 1, self.MAX_FRAME_SKIP)
+        elif elapsed < self.PROCESS_BUDGET / 2 and self._frame_skip > 0:
+            self._frame_skip -= 1
+    
+    def _detect(self, frame: np.ndarray) -> Optional[FaceLandmarks]:
+        rgb_buf = self._rgb_buf
+        if rgb_buf is None or rgb_buf.shape != frame.shape:
+            rgb_buf = self._rgb_buf = np.empty_like(frame)
+        rgb_buf.flags.writeable = True
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+        rgb_buf.flags.writeable = False
+        results = self.face_mesh.process(rgb_buf)
         
         if not results.multi_face_landmarks:
             return None
         
-        face_landmarks = results.multi_face_landmarks[0]
-        landmarks = [(lm.x, lm.y, lm.z) for lm in face_landmarks.landmark]
+        points = results.multi_face_landmarks[0].landmark
+        landmarks = np.fromiter(
+            (c for lm in points for c in (lm.x, lm.y, lm.z)),
+            dtype=np.float32,
+            count=len(points) * 3
+        ).reshape(-1, 3)
         
         return FaceLandmarks(
             landmarks=landmarks,
@@ -96,90 +237,63 @@ class VisionEngine:
             image_height=frame.shape[0]
         )
     
-    def draw_landmarks(self, frame: np.ndarray, face_landmarks: FaceLandmarks) -> np.ndarray:
+    def draw_landmarks(self, frame: np.ndarray, face_landmarks: FaceLandmarks, inplace: bool = False) -> np.ndarray:
         if face_landmarks is None:
             return frame
         
-        annotated_frame = frame.copy()
+        annotated_frame = frame if inplace else frame.copy()
         
-        for idx in self.LEFT_EYE_INDICES + self.RIGHT_EYE_INDICES:
-            point = face_landmarks.get_landmark(idx)
-            cv2.circle(annotated_frame, point, 2, (0, 255, 0), -1)
+        for x, y in face_landmarks.px[self.EYE_POINT_INDICES].tolist():
+            cv2.circle(annotated_frame, (x, y), 2, (0, 255, 0), -1)
         
-        nose = face_landmarks.get_landmark(self.NOSE_TIP)
+        nose, chin, forehead = (tuple(p) for p in face_landmarks.px[self.FEATURE_POINT_INDICES].tolist())
         cv2.circle(annotated_frame, nose, 3, (255, 0, 0), -1)
-        
-        chin = face_landmarks.get_landmark(self.CHIN)
         cv2.circle(annotated_frame, chin, 3, (255, 0, 0), -1)
-        
-        forehead = face_landmarks.get_landmark(self.FOREHEAD)
         cv2.circle(annotated_frame, forehead, 3, (255, 0, 0), -1)
         
         cv2.line(annotated_frame, forehead, chin, (255, 255, 0), 1)
         
         return annotated_frame
     
-    def calculate_eye_aspect_ratio(self, face_landmarks: FaceLandmarks, eye: str = "left") -> float:
-        if eye == "left":
-            top = face_landmarks.get_landmark(self.LEFT_EYE_TOP)
-            bottom = face_landmarks.get_landmark(self.LEFT_EYE_BOTTOM)
-            outer = face_landmarks.get_landmark(self.LEFT_EYE_INDICES[3])
-            inner = face_landmarks.get_landmark(self.LEFT_EYE_INDICES[0])
-        else:
-            top = face_landmarks.get_landmark(self.RIGHT_EYE_TOP)
-            bottom = face_landmarks.get_landmark(self.RIGHT_EYE_BOTTOM)
-            outer = face_landmarks.get_landmark(self.RIGHT_EYE_INDICES[3])
-            inner = face_landmarks.get_landmark(self.RIGHT_EYE_INDICES[0])
-        
-        vertical_dist = np.sqrt((top[0] - bottom[0])**2 + (top[1] - bottom[1])**2)
-        horizontal_dist = np.sqrt((outer[0] - inner[0])**2 + (outer[1] - inner[1])**2)
-        
-        if horizontal_dist == 0:
-            return 0.0
-        
-        ear = vertical_dist / horizontal_dist
-        return ear
-    
-    def calculate_head_pose(self, face_landmarks: FaceLandmarks) -> Tuple[float, float, float]:
-        nose = face_landmarks.get_landmark_3d(self.NOSE_TIP)
-        chin = face_landmarks.get_landmark_3d(self.CHIN)
-        forehead = face_landmarks.get_landmark_3d(self.FOREHEAD)
-        left_eye = face_landmarks.get_landmark_3d(self.LEFT_EYE_OUTER)
-        right_eye = face_landmarks.get_landmark_3d(self.RIGHT_EYE_OUTER)
-        
-        eye_center_x = (left_eye[0] + right_eye[0]) / 2
-        eye_center_y = (left_eye[1] + right_eye[1]) / 2
-        
-        dx = right_eye[0] - left_eye[0]
-        dy = right_eye[1] - left_eye[1]
-        roll = np.degrees(np.arctan2(dy, dx))
-        
-        vertical_dx = chin[0] - forehead[0]
-        vertical_dy = chin[1] - forehead[1]
-        pitch = np.degrees(np.arctan2(vertical_dx, vertical_dy))
-        
-        face_center_x = (left_eye[0] + right_eye[0]) / 2
-        frame_center = face_landmarks.image_width / 2
-        yaw = ((face_center_x - frame_center) / frame_center) * 30
-        
-        return (pitch, yaw, roll)
-    
-    def estimate_face_distance(self, face_landmarks: FaceLandmarks) -> float:
-        left_eye = face_landmarks.get_landmark(self.LEFT_EYE_OUTER)
-        right_eye = face_landmarks.get_landmark(self.RIGHT_EYE_OUTER)
-        
-        eye_distance_px = np.sqrt(
-            (left_eye[0] - right_eye[0])**2 + 
-            (left_eye[1] - right_eye[1])**2
+    def calculate_face_metrics(self, face_landmarks: FaceLandmarks) -> Tuple[float, float, float, float, float, float]:
+        return _face_metrics_kernel(
+            face_landmarks.landmarks,
+            face_landmarks.image_width,
+            face_landmarks.image_height,
+            self.FACE_METRIC_INDICES
         )
-        
-        AVERAGE_EYE_DISTANCE_CM = 6.3
-        FOCAL_LENGTH_ESTIMATE = 600
-        
-        if eye_distance_px > 0:
-            distance_cm = (AVERAGE_EYE_DISTANCE_CM * FOCAL_LENGTH_ESTIMATE) / eye_distance_px
-            return distance_cm
-        return 0.0
     
     def __del__(self):
         self.stop_camera()
+
+class CaptureThread(threading.Thread):
+    def __init__(self, vision_engine: VisionEngine):
+        super().__init__(daemon=True)
+        self.vision_engine = vision_engine
+        self.frame: Optional[np.ndarray] = None
+        self.frame_ready = threading.Condition()
+        self.stopped = threading.Event()
+    
+    def run(self):
+        while not self.stopped.is_set():
+            frame = self.vision_engine._read_camera()
+            if frame is None:
+                self.stopped.wait(0.01)
+                continue
+            with self.frame_ready:
+                self.frame = frame
+                self.frame_ready.notify()
+    
+    def read(self, timeout: float = 0.0) -> Optional[np.ndarray]:
+        with self.frame_ready:
+            if timeout > 0:
+                self.frame_ready.wait_for(lambda: self.frame is not None or self.stopped.is_set(), timeout)
+            frame, self.frame = self.frame, None
+        return frame
+    
+    def stop(self):
+        self.stopped.set()
+        with self.frame_ready:
+            self.frame_ready.notify_all()
+        if self.is_alive():
+            self.join(timeout=1.0)